@@ -1,45 +1,143 @@
 # -*- coding: utf-8 -*-
 import argparse
+from collections.abc import Mapping
+from typing import NamedTuple
 
 # --- 基礎設定與通用邏輯 ---
 
+# 預先合併的單位換算常數
+# 裝置功耗 (W) × 執行天數 -> kWh: × 24 h / 1e3
+_KWH_PER_WATT_DAY = 24 / 1000
+# kWh -> MWh
+_MWH_PER_KWH = 1 / 1000
+# gCO₂eq/kWh × kWh -> tCO₂eq
+_T_PER_G = 1 / 1_000_000
+_SECONDS_PER_DAY = 3600 * 24
+
+
+def _execution_days(total_zettaflops, peak_tflops, hardware_efficiency_perc, device_num):
+    """
+    根據總運算量 (ZettaFLOPs) 估算執行天數 (單一情境的純量計算)。
+    """
+    total_flops = total_zettaflops * 1e21
+    achieved_tflops_per_second = peak_tflops * (hardware_efficiency_perc / 100)
+
+    if achieved_tflops_per_second == 0 or device_num == 0:
+        return 0
+
+    execution_seconds = total_flops / (device_num * achieved_tflops_per_second * 1e12)
+    return execution_seconds / _SECONDS_PER_DAY
+
+
+def _carbon_emission(execution_days, system_power_w, device_num, pue, co2_intensity_g_kwh):
+    """
+    根據執行天數計算總耗電量與碳排 (單一情境的純量計算)。
+    """
+    total_energy_kwh = system_power_w * device_num * pue * execution_days * _KWH_PER_WATT_DAY
+
+    return {
+        "operational_co2_t": total_energy_kwh * co2_intensity_g_kwh * _T_PER_G,
+        "total_energy_mwh": total_energy_kwh * _MWH_PER_KWH
+    }
+
+
+class HardwarePreset(NamedTuple):
+    """
+    單一硬體裝置的預設參數。
+
+    為相容舊版的 dict 格式，提供以字串鍵讀取的唯讀 mapping 方法
+    (preset['peak_tflops']、in、get、keys、values、items、dict(preset))；
+    直接迭代時仍依 tuple 語意回傳欄位值。
+
+    >>> preset = HardwarePreset(peak_tflops=125.0)
+    >>> preset['peak_tflops'], preset.get('tdp_w'), 'peak_tflops' in preset
+    (125.0, None, True)
+    >>> dict(preset)
+    {'peak_tflops': 125.0}
+    """
+    peak_tflops: float
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        return tuple.__getitem__(self, key)
+
+    def __contains__(self, key):
+        if isinstance(key, str):
+            return key in self._fields
+        return tuple.__contains__(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in self._fields else default
+
+    def keys(self):
+        return self._fields
+
+    def values(self):
+        return tuple(self)
+
+    def items(self):
+        return tuple(zip(self._fields, self))
+
+
+def _resolve_preset(presets, device):
+    """
+    查詢硬體預設參數；舊版 dict 格式的項目會轉換為 HardwarePreset
+    (僅保留計算所需的 peak_tflops，其餘鍵值會被忽略)。
+
+    >>> _resolve_preset({'X': {'peak_tflops': 100, 'tdp_w': 300}}, 'X')
+    HardwarePreset(peak_tflops=100)
+    >>> _resolve_preset({'X': {'tdp_w': 300}}, 'X')
+    Traceback (most recent call last):
+        ...
+    ValueError: 硬體裝置 X 的預設參數缺少 peak_tflops。
+    """
+    try:
+        preset = presets[device]
+    except KeyError:
+        raise ValueError(
+            f"不支援的硬體裝置: {device}。"
+            f"請從 {list(presets.keys())} 中選擇。"
+        ) from None
+    if isinstance(preset, dict):
+        try:
+            preset = HardwarePreset(peak_tflops=preset['peak_tflops'])
+        except KeyError:
+            raise ValueError(f"硬體裝置 {device} 的預設參數缺少 peak_tflops。") from None
+    return preset
+
+
 class LLMCarbonCalculatorBase:
     """
     計算模型的基礎類別，包含共享的參數與設定。
     """
     # 預設硬體參數 (參考 LLMCarbon 論文 Table 4 & 相關資料)
     HARDWARE_PRESETS = {
-        'V100': {'peak_tflops': 125},
-        'H100': {'peak_tflops': 1979},
-        'TPUv3': {'peak_tflops': 123},
-        'TPUv4': {'peak_tflops': 275},
-        'A100': {'peak_tflops': 312}, 
+        'V100': HardwarePreset(peak_tflops=125.0),
+        'H100': HardwarePreset(peak_tflops=1979.0),
+        'TPUv3': HardwarePreset(peak_tflops=123.0),
+        'TPUv4': HardwarePreset(peak_tflops=275.0),
+        'A100': HardwarePreset(peak_tflops=312.0),
     }
 
     def __init__(self, args):
         self.args = args
-        self.preset = self.HARDWARE_PRESETS.get(args.device)
-        if not self.preset:
-            raise ValueError(
-                f"不支援的硬體裝置: {args.device}。"
-                f"請從 {list(self.HARDWARE_PRESETS.keys())} 中選擇。"
-            )
+        preset = self.HARDWARE_PRESETS.get(args.device)
+        if type(preset) is not HardwarePreset:
+            # 不支援的裝置或舊版 dict 格式的項目
+            preset = _resolve_preset(self.HARDWARE_PRESETS, args.device)
+        self.preset = preset
 
     def _calculate_carbon_emission(self, execution_days):
         """
         根據執行天數計算總耗電量與碳排 (通用邏輯)。
         """
-        total_power_kw = (self.args.system_power_w * self.args.device_num) / 1000
-        total_energy_kwh = total_power_kw * (execution_days * 24) * self.args.pue
-        total_energy_mwh = total_energy_kwh / 1000
-
-        carbon_intensity_t_per_kwh = self.args.co2_intensity_g_kwh / 1_000_000
-        operational_co2_t = total_energy_kwh * carbon_intensity_t_per_kwh
-        
-        return {
-            "operational_co2_t": operational_co2_t,
-            "total_energy_mwh": total_energy_mwh
-        }
+        args = self.args
+        return _carbon_emission(execution_days, args.system_power_w, args.device_num,
+                                args.pue, args.co2_intensity_g_kwh)
 
     def run(self):
         """主執行方法，由子類別實現"""
@@ -54,23 +152,19 @@ class TrainingCarbonCalculator(LLMCarbonCalculatorBase):
     """
     def run(self):
         """執行訓練碳排計算"""
+        args = self.args
         # 根據論文公式 4: TC ≈ 6PD
         flop_multiplier = 6
-        active_params_b = self.args.base_model_params_b if self.args.model_type == 'MoE' else self.args.parameters_b
+        active_params_b = args.base_model_params_b if args.model_type == 'MoE' else args.parameters_b
         
         # 單位: P (Billion), D (Trillion)
-        total_zettaflops = flop_multiplier * active_params_b * self.args.train_tokens_t
-        total_flops = total_zettaflops * 1e21
+        total_zettaflops = flop_multiplier * active_params_b * args.train_tokens_t
+        device_num = args.device_num
+        execution_days = _execution_days(total_zettaflops, self.preset.peak_tflops,
+                                         args.hardware_efficiency_perc, device_num)
 
-        achieved_tflops_per_second = self.preset['peak_tflops'] * (self.args.hardware_efficiency_perc / 100)
-        
-        if achieved_tflops_per_second == 0 or self.args.device_num == 0:
-            execution_days = 0
-        else:
-            execution_seconds = total_flops / (self.args.device_num * achieved_tflops_per_second * 1e12)
-            execution_days = execution_seconds / (3600 * 24)
-
-        results = self._calculate_carbon_emission(execution_days)
+        results = _carbon_emission(execution_days, args.system_power_w, device_num,
+                                   args.pue, args.co2_intensity_g_kwh)
         results['execution_days'] = execution_days
         return results
 
@@ -83,31 +177,130 @@ class InferenceCarbonCalculator(LLMCarbonCalculatorBase):
     """
     def run(self):
         """執行推論碳排計算"""
+        args = self.args
         # 根據論文公式 5: IC ≈ 2PD
         flop_multiplier = 2
-        active_params_b = self.args.base_model_params_b if self.args.model_type == 'MoE' else self.args.parameters_b
+        active_params_b = args.base_model_params_b if args.model_type == 'MoE' else args.parameters_b
 
         # 單位轉換: P (Billion), D (Thousand) -> (1e9 * 1e3)
         # 為了與 ZettaFLOPs 對應，先將 K 轉為 T (除以 1e9)
-        tokens_t = self.args.infer_tokens_k / 1_000_000_000
+        tokens_t = args.infer_tokens_k / 1_000_000_000
         
         total_zettaflops = flop_multiplier * active_params_b * tokens_t
-        total_flops = total_zettaflops * 1e21
+        device_num = args.device_num
+        execution_days = _execution_days(total_zettaflops, self.preset.peak_tflops,
+                                         args.hardware_efficiency_perc, device_num)
 
-        achieved_tflops_per_second = self.preset['peak_tflops'] * (self.args.hardware_efficiency_perc / 100)
-
-        if achieved_tflops_per_second == 0 or self.args.device_num == 0:
-            execution_days = 0
-        else:
-            execution_seconds = total_flops / (self.args.device_num * achieved_tflops_per_second * 1e12)
-            execution_days = execution_seconds / (3600 * 24)
-            
-        results = self._calculate_carbon_emission(execution_days)
+        results = _carbon_emission(execution_days, args.system_power_w, device_num,
+                                   args.pue, args.co2_intensity_g_kwh)
         # 推論時間通常較短，轉換為秒或分鐘可能更合適
         results['execution_seconds'] = execution_days * 24 * 3600
         return results
 
 
+# --- 批次情境計算 ---
+
+def _broadcast(*values):
+    """
+    將純量與序列參數對齊為相同長度的欄位；純量 (含字串) 會被重複使用。
+    任何具有長度的非字串物件 (list、tuple、range、NumPy 陣列、pandas Series 等) 皆視為欄位；
+    dict 等 mapping 與無法取得長度的物件 (例如 0 維 NumPy 陣列) 會引發 ValueError。
+    """
+    columns = []
+    for v in values:
+        if isinstance(v, Mapping):
+            raise ValueError(f"批次參數不支援 mapping 型別: {type(v).__name__}")
+        if isinstance(v, str) or not hasattr(v, '__len__'):
+            columns.append(None)
+            continue
+        try:
+            len(v)
+        except TypeError:
+            raise ValueError(f"批次參數無法取得長度: {type(v).__name__}") from None
+        columns.append(list(v))
+
+    lengths = {len(c) for c in columns if c is not None}
+    if len(lengths) > 1:
+        raise ValueError(f"批次參數長度不一致: {sorted(lengths)}")
+    n = lengths.pop() if lengths else 1
+    return [[v] * n if c is None else c for v, c in zip(values, columns)]
+
+
+def calculate_carbon_footprint_batch(parameters_b, tokens_t, device='V100', hardware_efficiency_perc=19.7,
+                                     device_num=10000, system_power_w=330, pue=1.1, co2_intensity_g_kwh=429):
+    """
+    批次計算多組訓練情境的營運碳排 (公式 4: TC ≈ 6PD)。
+
+    每個參數可為純量或序列 (list、tuple、range、NumPy 陣列等非字串的可取長度物件)，
+    純量會自動擴展至序列長度。
+    parameters_b 為實際參與運算的參數量 (MoE 模型請傳入基礎模型參數)。
+    回傳以欄位為單位的 dict，每個值皆為與輸入等長的 list。
+
+    單一情境的結果與 TrainingCarbonCalculator.run() 一致:
+
+    >>> args = argparse.Namespace(
+    ...     model_type='dense', parameters_b=175, base_model_params_b=2.3,
+    ...     device='V100', device_num=1024, system_power_w=400,
+    ...     hardware_efficiency_perc=25, pue=1.1, co2_intensity_g_kwh=429,
+    ...     train_tokens_t=300)
+    >>> expected = TrainingCarbonCalculator(args).run()
+    >>> batch = calculate_carbon_footprint_batch(
+    ...     175, 300, 'V100', 25, [1024, 2048], 400, 1.1, 429)
+    >>> all(batch[key][0] == expected[key] for key in expected)
+    True
+    >>> [round(days, 2) for days in batch['execution_days']]
+    [113932.29, 56966.15]
+
+    純量會擴展至序列長度，字串視為純量:
+
+    >>> batch = calculate_carbon_footprint_batch(
+    ...     175, 300, 'V100', 25, range(1, 4), 400, 1.1, [429, 0, 429])
+    >>> len(batch['execution_days']), batch['operational_co2_t'][1]
+    (3, 0.0)
+    >>> [round(energy) for energy in batch['total_energy_mwh']]
+    [1232000, 1232000, 1232000]
+
+    序列長度不一致、不支援的參數型別或硬體裝置會引發 ValueError:
+
+    >>> calculate_carbon_footprint_batch([175, 70], [300, 1, 2])
+    Traceback (most recent call last):
+        ...
+    ValueError: 批次參數長度不一致: [2, 3]
+    >>> calculate_carbon_footprint_batch(175, 300, device_num={1024: 'a'})
+    Traceback (most recent call last):
+        ...
+    ValueError: 批次參數不支援 mapping 型別: dict
+    >>> calculate_carbon_footprint_batch(175, 300, device=['V100', 'X'])
+    Traceback (most recent call last):
+        ...
+    ValueError: 不支援的硬體裝置: X。請從 ['V100', 'H100', 'TPUv3', 'TPUv4', 'A100'] 中選擇。
+    """
+    columns = _broadcast(parameters_b, tokens_t, device, hardware_efficiency_perc,
+                         device_num, system_power_w, pue, co2_intensity_g_kwh)
+
+    # 每種裝置僅查表一次
+    presets = LLMCarbonCalculatorBase.HARDWARE_PRESETS
+    peak_tflops = {}
+    for name in set(columns[2]):
+        peak_tflops[name] = _resolve_preset(presets, name).peak_tflops
+
+    # 逐一情境以 Python 迴圈計算，與計算器類別共用相同的純量函式
+    execution_days_col, energy_col, co2_col = [], [], []
+    for params, tokens, name, eff, num, power, pue_value, intensity in zip(*columns):
+        execution_days = _execution_days(6 * params * tokens, peak_tflops[name], eff, num)
+        emission = _carbon_emission(execution_days, power, num, pue_value, intensity)
+
+        execution_days_col.append(execution_days)
+        energy_col.append(emission["total_energy_mwh"])
+        co2_col.append(emission["operational_co2_t"])
+
+    return {
+        "execution_days": execution_days_col,
+        "total_energy_mwh": energy_col,
+        "operational_co2_t": co2_col
+    }
+
+
 # --- 命令列介面與主程式 ---
 
 def main():